@@ -0,0 +1,46 @@
+"""
+Newsletter setup tools.
+
+Each script can be run directly (see README.md) or imported, e.g.
+
+    from tools.scripts import Pipeline, load_url_mapping
+
+Names are resolved lazily so importing the package doesn't load every
+script and its dependencies. The exception is functions named after their
+own submodule: importing that submodule (as pipeline.py does) rebinds the
+package attribute to the module, so those are bound eagerly instead. Their
+modules only need re and pathlib.
+"""
+import importlib
+
+from .download_images import download_images
+from .restore_images import restore_images
+from .update_image_paths import update_image_paths
+
+_EXPORTS = {
+    'extract_image_urls': 'extract_urls',
+    'read_url_list': 'extract_urls',
+    'write_url_list': 'extract_urls',
+    'local_path_for': 'download_images',
+    'load_url_mapping': 'mapping',
+    'parse_url_mapping': 'mapping',
+    'write_url_mapping': 'mapping',
+    'build_url_pattern': 'mapping',
+    'Pipeline': 'pipeline',
+    'SectionIndex': 'section_index',
+    'collect_sections': 'templates',
+    'collect_templates': 'templates',
+    'clamp_widths': 'email_lint',
+    'lint_source': 'email_lint',
+}
+
+__all__ = sorted([*_EXPORTS, 'download_images', 'restore_images', 'update_image_paths'])
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f'.{_EXPORTS[name]}', __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
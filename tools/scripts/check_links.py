@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Check every link and image URL used by the newsletters, sections and
+tools/*-backup.html files.
+
+All files are parsed once, URLs are de-duplicated across files, and each
+unique remote URL is checked once with a HEAD request (falling back to GET
+when the server rejects HEAD). Requests run concurrently over pooled
+keep-alive connections with a per-host limit. Results are cached in
+tools/link_cache.json: working URLs are re-checked once they are older than
+the TTL, broken ones on every run so a transient failure doesn't stick.
+Relative paths are checked against the local file tree.
+
+Usage:
+    python3 tools/scripts/check_links.py
+    python3 tools/scripts/check_links.py --ttl 3600 --json
+    python3 tools/scripts/check_links.py --self-test
+"""
+import argparse
+from collections import deque
+import http.client
+import json
+import re
+import ssl
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+try:
+    from .templates import collect_templates
+except ImportError:
+    from templates import collect_templates
+
+DEFAULT_TTL = 24 * 3600
+DEFAULT_WORKERS = 16
+DEFAULT_PER_HOST = 4
+TIMEOUT = 10
+MAX_REDIRECTS = 5
+USER_AGENT = 'Email-HTML-Templates link checker'
+
+URL_ATTRS = {'href', 'src', 'background'}
+CSS_URL_PATTERN = re.compile(r'''url\(\s*['"]?([^'")]+?)['"]?\s*\)''', re.IGNORECASE)
+SKIP_SCHEMES = ('mailto:', 'tel:', 'javascript:', 'data:', 'sms:', '#')
+# Served by the hosting platform rather than from the repo
+SKIP_PREFIXES = ('/_vercel/',)
+
+
+class LinkCollector(HTMLParser):
+    """Collect href/src/background attributes and CSS url() values."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.urls = set()
+        self._in_style = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'style':
+            self._in_style = True
+        for name, value in attrs:
+            if not value:
+                continue
+            if name in URL_ATTRS:
+                self.urls.add(value.strip())
+            elif name == 'style':
+                self.urls.update(m.strip() for m in CSS_URL_PATTERN.findall(value))
+
+    def handle_endtag(self, tag):
+        if tag == 'style':
+            self._in_style = False
+
+    def handle_data(self, data):
+        if self._in_style:
+            self.urls.update(m.strip() for m in CSS_URL_PATTERN.findall(data))
+
+
+def collect_urls(html_content):
+    """Return the set of URLs referenced by an HTML document."""
+    collector = LinkCollector()
+    collector.feed(html_content)
+    collector.close()
+    return {url for url in collector.urls if url and not url.lower().startswith(SKIP_SCHEMES)}
+
+
+def collect_files(base_dir):
+    """Return every newsletter, section and backup HTML file under base_dir."""
+    return collect_templates(base_dir) + sorted((base_dir / 'tools').glob('*-backup.html'))
+
+
+def is_remote(url):
+    return url.lower().startswith(('http://', 'https://', '//'))
+
+
+def url_host(url):
+    return urlsplit(url).netloc.lower()
+
+
+def check_local(url, template, base_dir):
+    """Check that a relative or root-relative path exists on disk."""
+    path = urlsplit(url).path
+    if not path or '{' in path or path.startswith(SKIP_PREFIXES):
+        return {'ok': True, 'status': None, 'error': None}
+    target = base_dir / path.lstrip('/') if path.startswith('/') else template.parent / path
+    if target.exists():
+        return {'ok': True, 'status': None, 'error': None}
+    return {'ok': False, 'status': None, 'error': 'file not found'}
+
+
+class LinkChecker:
+    """Concurrent HEAD/GET checker with per-thread keep-alive connections."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, per_host=DEFAULT_PER_HOST, timeout=TIMEOUT):
+        self.workers = workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self._ssl_context = ssl.create_default_context()
+        self._local = threading.local()
+        self._host_limits = {}
+        self._host_limits_lock = threading.Lock()
+
+    def _host_limit(self, host):
+        with self._host_limits_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    def _connection(self, scheme, netloc):
+        pool = getattr(self._local, 'pool', None)
+        if pool is None:
+            pool = self._local.pool = {}
+        key = (scheme, netloc)
+        if key not in pool:
+            if scheme == 'https':
+                pool[key] = http.client.HTTPSConnection(
+                    netloc, timeout=self.timeout, context=self._ssl_context)
+            else:
+                pool[key] = http.client.HTTPConnection(netloc, timeout=self.timeout)
+        return pool[key]
+
+    def _drop_connection(self, scheme, netloc):
+        conn = self._local.pool.pop((scheme, netloc), None)
+        if conn is not None:
+            conn.close()
+
+    def _request(self, method, url):
+        """Send one request, retrying once on a stale keep-alive connection."""
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        headers = {'User-Agent': USER_AGENT}
+        if method == 'GET':
+            # Only the status matters; ask for as little body as possible
+            headers['Range'] = 'bytes=0-0'
+        for attempt in (1, 2):
+            conn = self._connection(parts.scheme, parts.netloc)
+            try:
+                conn.request(method, path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.will_close:
+                    self._drop_connection(parts.scheme, parts.netloc)
+                return response.status, response.getheader('Location')
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                self._drop_connection(parts.scheme, parts.netloc)
+                if attempt == 2:
+                    raise
+            except Exception:
+                self._drop_connection(parts.scheme, parts.netloc)
+                raise
+
+    def check(self, url):
+        """Return {'ok', 'status', 'error'} for a single remote URL."""
+        if url.startswith('//'):
+            url = 'https:' + url
+        try:
+            for _ in range(MAX_REDIRECTS + 1):
+                # check_all() keeps first hops within the limit; this also covers redirects
+                with self._host_limit(url_host(url)):
+                    status, location = self._request('HEAD', url)
+                    if status in (403, 405, 501) or status >= 500:
+                        status, location = self._request('GET', url)
+                if 300 <= status < 400 and location:
+                    url = urljoin(url, location)
+                    continue
+                return {'ok': status < 400, 'status': status, 'error': None}
+            return {'ok': False, 'status': status, 'error': 'too many redirects'}
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            return {'ok': False, 'status': None, 'error': f'{type(e).__name__}: {e}'}
+
+    def check_all(self, urls):
+        """
+        Check URLs concurrently. Returns {url: result}.
+
+        URLs are queued per host and handed to the pool round-robin, only
+        while their host has a free slot, so workers aren't left waiting on
+        one busy host while URLs for other hosts are queued.
+        """
+        queues = {}
+        for url in sorted(urls):
+            queues.setdefault(url_host(url), deque()).append(url)
+        active = dict.fromkeys(queues, 0)
+        pending = {}
+        results = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            def submit_ready():
+                submitted = True
+                while submitted and len(pending) < self.workers:
+                    submitted = False
+                    for host, queue in queues.items():
+                        if queue and active[host] < self.per_host and len(pending) < self.workers:
+                            url = queue.popleft()
+                            active[host] += 1
+                            pending[executor.submit(self.check, url)] = (url, host)
+                            submitted = True
+
+            submit_ready()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url, host = pending.pop(future)
+                    active[host] -= 1
+                    results[url] = future.result()
+                submit_ready()
+        return results
+
+
+def load_cache(cache_path):
+    if Path(cache_path).exists():
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_cache(cache_path, cache):
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+
+
+def _needs_check(entry, now, ttl):
+    return entry is None or not entry['ok'] or now - entry['checked_at'] > ttl
+
+
+def run(files, base_dir, cache, ttl=DEFAULT_TTL, checker=None):
+    """
+    Check every URL referenced by `files`, reusing successful cache entries
+    younger than `ttl` seconds; failures are always re-checked. `cache` is
+    updated in place.
+
+    Returns (report, checked_count) where report maps each template's path
+    to the list of its broken URLs with their results.
+    """
+    checker = checker or LinkChecker()
+    refs = {}
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            refs[path] = collect_urls(f.read())
+
+    now = time.time()
+    remote = {url for urls in refs.values() for url in urls if is_remote(url)}
+    expired = {url for url in remote if _needs_check(cache.get(url), now, ttl)}
+    for url, result in checker.check_all(expired).items():
+        result['checked_at'] = now
+        cache[url] = result
+
+    report = {}
+    for path, urls in refs.items():
+        broken = []
+        for url in sorted(urls):
+            result = cache[url] if is_remote(url) else check_local(url, path, base_dir)
+            if not result['ok']:
+                broken.append({'url': url, 'status': result['status'], 'error': result['error']})
+        rel_path = Path(path).relative_to(base_dir).as_posix()
+        report[rel_path] = broken
+    return report, len(expired)
+
+
+class StandInServer:
+    """
+    Local HTTP server for exercising the checker without network access.
+
+    `routes` maps a path to a status code, or to (status, location) for
+    redirects. Paths listed in `no_head` answer HEAD with 405 so the GET
+    fallback is used. Unknown paths return 404. Each response waits `delay`
+    seconds. `hosts` lists the Host header of each request in arrival order
+    and `max_active` the most requests in flight at once per Host.
+
+        with StandInServer({'/ok.png': 200}) as server:
+            LinkChecker().check(server.url('/ok.png'))
+    """
+
+    def __init__(self, routes, no_head=(), delay=0):
+        self.routes = dict(routes)
+        self.no_head = set(no_head)
+        self.delay = delay
+        self.requests = []
+        self.hosts = []
+        self.max_active = {}
+        self._active = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def url(self, path, host=None):
+        address, port = self._server.server_address[:2]
+        return f'http://{host or address}:{port}{path}'
+
+    def _track(self, host, change):
+        with self._lock:
+            self._active[host] = self._active.get(host, 0) + change
+            self.max_active[host] = max(self.max_active.get(host, 0), self._active[host])
+
+    def __enter__(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _respond(self, method):
+                host = self.headers.get('Host', '').lower()
+                stand_in.requests.append((method, self.path))
+                stand_in.hosts.append(host)
+                stand_in._track(host, 1)
+                try:
+                    time.sleep(stand_in.delay)
+                finally:
+                    stand_in._track(host, -1)
+                if method == 'HEAD' and self.path in stand_in.no_head:
+                    route = 405
+                else:
+                    route = stand_in.routes.get(self.path, 404)
+                status, location = route if isinstance(route, tuple) else (route, None)
+                self.send_response(status)
+                if location:
+                    self.send_header('Location', location)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_HEAD(self):
+                self._respond('HEAD')
+
+            def do_GET(self):
+                self._respond('GET')
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+
+def _self_test_run(failures):
+    """Check run(): the per-template report and which URLs the cache re-checks."""
+    routes = {'/ok.png': 200, '/moved': (301, '/ok.png'), '/gone': 410}
+    with StandInServer(routes) as server, tempfile.TemporaryDirectory() as tmp:
+        base_dir = Path(tmp)
+        (base_dir / 'logo.png').write_bytes(b'')
+        template = base_dir / 'newsletter-1.html'
+        template.write_text(
+            f'<a href="{server.url("/moved")}"><img src="{server.url("/ok.png")}" alt=""></a>'
+            f'<img src="{server.url("/gone")}" alt=""><img src="logo.png" alt="">'
+            f'<img src="missing.png" alt="">', encoding='utf-8')
+        checker = LinkChecker(workers=4, per_host=2, timeout=5)
+        cache = {}
+
+        report, checked = run([template], base_dir, cache, 3600, checker)
+        broken = sorted(item['url'].rsplit('/', 1)[-1] for item in report['newsletter-1.html'])
+        if checked != 3 or broken != ['gone', 'missing.png']:
+            failures.append(f'first run: {checked} checked, broken {broken}')
+
+        # Within the TTL only the failed URL is checked again
+        before = len(server.requests)
+        _, checked = run([template], base_dir, cache, 3600, checker)
+        paths = sorted(path for _, path in server.requests[before:])
+        if checked != 1 or paths != ['/gone']:
+            failures.append(f'second run: {checked} checked, requests {paths}')
+
+        # An expired entry is re-checked along with the failure
+        cache[server.url('/ok.png')]['checked_at'] -= 7200
+        before = len(server.requests)
+        _, checked = run([template], base_dir, cache, 3600, checker)
+        paths = sorted(path for _, path in server.requests[before:])
+        if checked != 2 or paths != ['/gone', '/ok.png']:
+            failures.append(f'third run: {checked} checked, requests {paths}')
+
+
+def _self_test_concurrency(failures):
+    """Two hosts must be checked side by side without either exceeding per_host."""
+    workers, per_host = 4, 2
+    with StandInServer({}, delay=0.05) as server:
+        # Same server under two names, so the checker sees two hosts
+        urls = [server.url(f'/{i}.png', host) for host in ('127.0.0.1', 'localhost') for i in range(8)]
+        LinkChecker(workers=workers, per_host=per_host, timeout=5).check_all(urls)
+        max_active = dict(server.max_active)
+        first = set(server.hosts[:workers])
+    busiest = max(max_active.values())
+    if busiest > per_host:
+        failures.append(f'{busiest} concurrent requests to one host (limit {per_host})')
+    if len(first) != 2:
+        failures.append(f'first {workers} requests only went to {", ".join(sorted(first))}')
+
+
+def self_test():
+    """Run the checker against StandInServers and verify the results."""
+    failures = []
+    routes = {'/ok.png': 200, '/moved': (301, '/ok.png'), '/get-only': 200, '/gone': 410}
+    with StandInServer(routes, no_head={'/get-only'}) as server:
+        expected = {
+            server.url('/ok.png'): True,
+            server.url('/moved'): True,
+            server.url('/get-only'): True,
+            server.url('/gone'): False,
+            server.url('/missing'): False,
+        }
+        results = LinkChecker(workers=4, per_host=2, timeout=5).check_all(expected)
+        requests = list(server.requests)
+
+    failures.extend(f'{url}: {results.get(url)}' for url, ok in expected.items() if results[url]['ok'] != ok)
+    if ('GET', '/get-only') not in requests:
+        failures.append('GET fallback was not used for /get-only')
+    _self_test_run(failures)
+    _self_test_concurrency(failures)
+
+    for failure in failures:
+        print(f"  ✗ {failure}")
+    if failures:
+        print("Self-test failed")
+        return False
+    print(f"✓ Self-test passed ({len(expected)} URLs, {len(requests)} requests, "
+          f"plus run() caching and per-host scheduling)")
+    return True
+
+
+def main():
+    """Check all template links and print the broken ones per template."""
+    base_dir = Path(__file__).parent.parent.parent
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--ttl', type=int, default=DEFAULT_TTL,
+                        help=f'seconds before a cached working URL is re-checked (default {DEFAULT_TTL})')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'concurrent requests overall (default {DEFAULT_WORKERS})')
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST,
+                        help=f'concurrent requests per host (default {DEFAULT_PER_HOST})')
+    parser.add_argument('--cache', default=str(base_dir / 'tools' / 'link_cache.json'),
+                        help='path of the result cache')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--self-test', action='store_true',
+                        help='check against a local stand-in server and exit')
+    args = parser.parse_args()
+
+    if args.self_test:
+        sys.exit(0 if self_test() else 1)
+
+    cache = load_cache(args.cache)
+    checker = LinkChecker(workers=args.workers, per_host=args.per_host)
+    report, checked = run(collect_files(base_dir), base_dir, cache, args.ttl, checker)
+    save_cache(args.cache, cache)
+
+    broken_total = sum(len(broken) for broken in report.values())
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"Checked {checked} URLs ({len(cache)} cached)\n")
+        for template, broken in report.items():
+            if not broken:
+                continue
+            print(f"{template}: {len(broken)} broken")
+            for item in broken:
+                reason = item['status'] or item['error']
+                print(f"  ✗ {item['url']} ({reason})")
+        if broken_total:
+            print(f"\n{broken_total} broken link(s)")
+        else:
+            print("✓ No broken links found")
+
+    if broken_total:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
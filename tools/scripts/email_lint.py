@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Lint newsletters and sections against email HTML rules.
+
+Each file is tokenized once. Rules declare which tags and attributes they
+care about, and each start tag is only handed to the rules interested in it,
+so adding rules doesn't add passes over the document. Rules can offer an
+auto-fix that rewrites the tag (or <style> block) they were given. Markup
+inside conditional comments (<!--[if mso]>...<![endif]-->) is linted too,
+since that is what Outlook renders.
+
+Usage:
+    python3 tools/scripts/email_lint.py                  # lint everything
+    python3 tools/scripts/email_lint.py --fix            # apply auto-fixes
+    python3 tools/scripts/email_lint.py --json newsletter-5.html
+    python3 tools/scripts/email_lint.py --rules width-max-600,img-alt
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+
+try:
+    from .templates import SourceMap, collect_templates
+except ImportError:
+    from templates import SourceMap, collect_templates
+
+MAX_WIDTH = 600
+
+CONDITIONAL_COMMENT_PATTERN = re.compile(r'\[if [^\]]*\]>(.*)<!\[endif\]\s*$', re.DOTALL | re.IGNORECASE)
+
+RULES = {}
+
+
+def register(rule_class):
+    """Class decorator adding a rule to the registry under its name."""
+    RULES[rule_class.name] = rule_class()
+    return rule_class
+
+
+class Rule:
+    """
+    Base class for lint rules.
+
+    A rule receives start_tag() for every tag named in `tags` and every tag
+    carrying one of `attrs`; an empty `tags` and `attrs` means no tag events.
+    Rules with `wants_css` also receive the text of each <style> block.
+    """
+    name = ''
+    severity = 'warning'
+    tags = ()
+    attrs = ()
+    wants_css = False
+
+    def start_tag(self, tag, attrs, ctx):
+        pass
+
+    def css(self, text, ctx):
+        pass
+
+
+class LintContext:
+    """Collects issues and fixes for one file while it is being parsed."""
+
+    def __init__(self, path, source=''):
+        self.path = path
+        self.source = source
+        self.issues = []
+        self.fixes = {}
+        self._span = None
+        self._line = self._col = 0
+
+    def _enter(self, start, end, line, col):
+        self._span = (start, end)
+        self._line, self._col = line, col
+
+    def report(self, rule, message, fix=None):
+        """
+        Record an issue at the current token. `fix`, if given, maps the
+        token's source text to its corrected text; a fix that leaves the
+        text unchanged is dropped so the issue isn't reported as fixable.
+        """
+        if fix is not None:
+            text = self.source[self._span[0]:self._span[1]]
+            if fix(text) == text:
+                fix = None
+        self.issues.append({
+            'rule': rule.name,
+            'severity': rule.severity,
+            'line': self._line,
+            'col': self._col + 1,
+            'message': message,
+            'fixable': fix is not None,
+        })
+        if fix is not None:
+            self.fixes.setdefault(self._span, []).append(fix)
+
+
+class _Tokenizer(HTMLParser):
+    """
+    Single-pass tokenizer that dispatches events to interested rules.
+
+    The contents of a conditional comment are fed to a nested tokenizer;
+    `base` and `source_map` place its tokens in the enclosing file.
+    """
+
+    def __init__(self, source, ctx, by_tag, by_attr, css_rules, base=0, source_map=None):
+        super().__init__(convert_charrefs=True)
+        self.ctx = ctx
+        self.by_tag = by_tag
+        self.by_attr = by_attr
+        self.css_rules = css_rules
+        self._in_style = False
+        self._base = base
+        self._local_map = SourceMap(source)
+        self._source_map = source_map or self._local_map
+
+    def _offset(self):
+        offset = self._base + self._local_map.offset(self.getpos())
+        line, col = self._source_map.position(offset)
+        return offset, line, col
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'style':
+            self._in_style = True
+        rules = list(self.by_tag.get(tag, ()))
+        for name, _ in attrs:
+            for rule in self.by_attr.get(name, ()):
+                if rule not in rules:
+                    rules.append(rule)
+        if not rules:
+            return
+        start, line, col = self._offset()
+        self.ctx._enter(start, start + len(self.get_starttag_text()), line, col)
+        attr_map = {name: (value or '') for name, value in attrs}
+        for rule in rules:
+            rule.start_tag(tag, attr_map, self.ctx)
+
+    handle_startendtag = handle_starttag
+
+    def handle_endtag(self, tag):
+        if tag == 'style':
+            self._in_style = False
+
+    def handle_comment(self, data):
+        match = CONDITIONAL_COMMENT_PATTERN.match(data)
+        if not match:
+            return
+        start = self._offset()[0] + len('<!--') + match.start(1)
+        inner = _Tokenizer(match.group(1), self.ctx, self.by_tag, self.by_attr, self.css_rules,
+                           start, self._source_map)
+        inner.feed(match.group(1))
+        inner.close()
+
+    def handle_data(self, data):
+        # <style> content is CDATA, so it reaches us unmodified and in one piece
+        if not self._in_style or not self.css_rules:
+            return
+        start, line, col = self._offset()
+        self.ctx._enter(start, start + len(data), line, col)
+        for rule in self.css_rules:
+            rule.css(data, self.ctx)
+
+
+def _dispatch_tables(rules):
+    by_tag, by_attr, css_rules = {}, {}, []
+    for rule in rules:
+        for tag in rule.tags:
+            by_tag.setdefault(tag, []).append(rule)
+        for attr in rule.attrs:
+            by_attr.setdefault(attr, []).append(rule)
+        if rule.wants_css:
+            css_rules.append(rule)
+    return by_tag, by_attr, css_rules
+
+
+def lint_source(source, rules=None, path='<string>'):
+    """Lint an HTML string. Returns the LintContext with issues and fixes."""
+    rules = list(RULES.values()) if rules is None else rules
+    ctx = LintContext(path, source)
+    tokenizer = _Tokenizer(source, ctx, *_dispatch_tables(rules))
+    tokenizer.feed(source)
+    tokenizer.close()
+    return ctx
+
+
+def apply_fixes(source, fixes):
+    """Apply {(start, end): [fix, ...]} to source and return the new text."""
+    parts = []
+    last = 0
+    for (start, end), funcs in sorted(fixes.items()):
+        if start < last:
+            continue
+        text = source[start:end]
+        for func in funcs:
+            text = func(text)
+        parts.append(source[last:start])
+        parts.append(text)
+        last = end
+    parts.append(source[last:])
+    return ''.join(parts)
+
+
+def fix_source(source, rules=None):
+    """Return source with every available auto-fix applied."""
+    ctx = lint_source(source, rules)
+    return apply_fixes(source, ctx.fixes) if ctx.fixes else source
+
+
+# ---------------------------------------------------------------------------
+# Rules
+# ---------------------------------------------------------------------------
+
+# Case-insensitive like HTMLParser, which lowercases the attribute names rules see
+WIDTH_ATTR_PATTERN = re.compile(r'''((?<![\w-])width\s*=\s*(["']?))(\d+)(?=\2)''', re.IGNORECASE)
+WIDTH_STYLE_PATTERN = re.compile(r'(width:)(\d+)(?=px)', re.IGNORECASE)
+
+
+def _clamp_all(text):
+    """Clamp width="N" attributes and width:Npx declarations in text."""
+    def clamp(m):
+        # Only the number changes, so the original spelling and case are kept
+        return m.group(1) + str(MAX_WIDTH) if int(m.group(m.lastindex)) > MAX_WIDTH else m.group(0)
+
+    return WIDTH_STYLE_PATTERN.sub(clamp, WIDTH_ATTR_PATTERN.sub(clamp, text))
+
+
+@register
+class WidthClampRule(Rule):
+    """Fixed widths over 600px break the standard email container."""
+    name = 'width-max-600'
+    attrs = ('width', 'style')
+    wants_css = True
+
+    def _report(self, widths, ctx):
+        too_wide = [w for w in widths if w > MAX_WIDTH]
+        if too_wide:
+            ctx.report(self, f"width {max(too_wide)} exceeds {MAX_WIDTH}px", fix=_clamp_all)
+
+    def start_tag(self, tag, attrs, ctx):
+        widths = [int(w) for _, w in WIDTH_STYLE_PATTERN.findall(attrs.get('style', ''))]
+        if attrs.get('width', '').strip().isdigit():
+            widths.append(int(attrs['width']))
+        self._report(widths, ctx)
+
+    def css(self, text, ctx):
+        self._report([int(w) for _, w in WIDTH_STYLE_PATTERN.findall(text)], ctx)
+
+
+@register
+class ImgAltRule(Rule):
+    """Images need alt text for blocked-image and screen-reader views."""
+    name = 'img-alt'
+    severity = 'error'
+    tags = ('img',)
+
+    def start_tag(self, tag, attrs, ctx):
+        if 'alt' not in attrs:
+            ctx.report(self, "<img> is missing an alt attribute")
+
+
+def _add_role(text):
+    return re.sub(r'^<table\b', '<table role="presentation"', text, count=1, flags=re.IGNORECASE)
+
+
+@register
+class TableRoleRule(Rule):
+    """Layout tables should be hidden from screen readers."""
+    name = 'table-role'
+    tags = ('table',)
+
+    def start_tag(self, tag, attrs, ctx):
+        role = attrs.get('role')
+        if role is None:
+            ctx.report(self, '<table> is missing role="presentation"', fix=_add_role)
+        elif role not in ('presentation', 'none'):
+            # An explicit role may be deliberate (e.g. a real data table), so don't overwrite it
+            ctx.report(self, f'<table> has role="{role}" instead of role="presentation"')
+
+
+UNSUPPORTED_PROPERTIES = {
+    'position', 'transform', 'transition', 'animation', 'gap', 'object-fit',
+    'clip-path', 'filter', 'flex', 'flex-direction', 'flex-wrap', 'justify-content',
+    'align-items', 'grid-template-columns', 'grid-template-rows', 'grid-area',
+}
+UNSUPPORTED_DISPLAY = {'flex', 'inline-flex', 'grid', 'inline-grid'}
+CSS_DECLARATION_PATTERN = re.compile(r'([a-zA-Z-]+)\s*:\s*([^;{}]+)')
+
+
+def _unsupported_css(text):
+    found = []
+    for prop, value in CSS_DECLARATION_PATTERN.findall(text):
+        prop = prop.lower()
+        value = value.strip().lower()
+        if prop in UNSUPPORTED_PROPERTIES:
+            found.append(prop)
+        elif prop == 'display' and value.split(' ')[0] in UNSUPPORTED_DISPLAY:
+            found.append(f'display:{value.split(" ")[0]}')
+    return sorted(set(found))
+
+
+@register
+class UnsupportedCssRule(Rule):
+    """CSS that Outlook/Gmail ignore or strip."""
+    name = 'unsupported-css'
+    attrs = ('style',)
+    wants_css = True
+
+    def start_tag(self, tag, attrs, ctx):
+        found = _unsupported_css(attrs['style'])
+        if found:
+            ctx.report(self, f"<{tag}> uses unsupported CSS: {', '.join(found)}")
+
+    def css(self, text, ctx):
+        found = _unsupported_css(text)
+        if found:
+            ctx.report(self, f"<style> uses unsupported CSS: {', '.join(found)}")
+
+
+def clamp_widths(content):
+    """Clamp width attributes and width:Npx styles over 600 down to 600."""
+    return fix_source(content, [RULES['width-max-600']])
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def lint_file(path, rule_names=None, fix=False):
+    """Lint one file, optionally writing fixes back. Returns (path, issues, fixed)."""
+    rules = [RULES[name] for name in rule_names] if rule_names else None
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    ctx = lint_source(source, rules, str(path))
+    fixed = False
+    if fix and ctx.fixes:
+        new_source = apply_fixes(source, ctx.fixes)
+        if new_source != source:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(new_source)
+            fixed = True
+    return str(path), ctx.issues, fixed
+
+
+def _lint_file_args(args):
+    return lint_file(*args)
+
+
+def lint_files(paths, rule_names=None, fix=False, jobs=None):
+    """Lint files in parallel. Returns a list of (path, issues, fixed)."""
+    jobs = jobs or os.cpu_count() or 1
+    work = [(path, rule_names, fix) for path in paths]
+    if jobs == 1 or len(work) < 2:
+        return [lint_file(*args) for args in work]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(_lint_file_args, work, chunksize=max(1, len(work) // (jobs * 4))))
+
+
+def main():
+    """Lint the given files (or all newsletters and sections) and report."""
+    base_dir = Path(__file__).parent.parent.parent
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('files', nargs='*', help='files to lint (default: all newsletters and sections)')
+    parser.add_argument('--rules', help=f"comma-separated rules to run (default: all of {', '.join(RULES)})")
+    parser.add_argument('--fix', action='store_true', help='apply auto-fixes in place')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--jobs', type=int, help='worker processes (default: CPU count)')
+    args = parser.parse_args()
+
+    rule_names = None
+    if args.rules:
+        rule_names = [name.strip() for name in args.rules.split(',') if name.strip()]
+        unknown = [name for name in rule_names if name not in RULES]
+        if unknown:
+            print(f"Error: unknown rule(s): {', '.join(unknown)}")
+            sys.exit(1)
+
+    paths = [Path(p) for p in args.files] if args.files else collect_templates(base_dir)
+    missing = [p for p in paths if not p.exists()]
+    if missing:
+        print(f"Error: {missing[0]} not found!")
+        sys.exit(1)
+
+    results = lint_files(paths, rule_names, args.fix, args.jobs)
+
+    if args.json:
+        json.dump({path: issues for path, issues, _ in results}, sys.stdout, indent=2)
+        print()
+    else:
+        for path, issues, fixed in results:
+            if fixed:
+                print(f"✓ Fixed: {path}")
+            for issue in issues:
+                if args.fix and issue['fixable']:
+                    continue
+                print(f"{path}:{issue['line']}:{issue['col']}: "
+                      f"{issue['severity']}: {issue['message']} [{issue['rule']}]")
+        total = sum(len(issues) for _, issues, _ in results)
+        print(f"\n{total} issue(s) in {len(results)} file(s)")
+
+    errors = [i for _, issues, _ in results for i in issues
+              if i['severity'] == 'error' and not (args.fix and i['fixable'])]
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Export the site to a deploy directory with content-hashed assets.
+
+- Every file under assets/ is copied as name.<hash>.ext
+- Asset references in the HTML files are rewritten to the hashed names
+- HTML files get precompressed .gz (and .br if the brotli module is installed) siblings
+- A vercel.json is written that marks hashed assets as immutable
+
+Only files whose size or mtime changed since the last export are re-hashed
+and recompressed, so the deploy directory changes by the delta only.
+
+Usage:
+    python3 tools/scripts/export_deploy.py [output_dir]   (default: dist)
+"""
+import gzip
+import hashlib
+import json
+import re
+import shutil
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_NAME = '.export-manifest.json'
+MANIFEST_VERSION = 1
+HASH_LENGTH = 8
+
+# Matches relative, root-relative and ../ references into assets/. The
+# lookbehind anchors matches at an attribute value or url( so an assets/
+# path inside a remote URL (https://cdn.example.com/assets/...) is left alone.
+ASSET_REF_PATTERN = re.compile(r'''(?<=["'(=\s])(?P<prefix>(?:\.\./)*/?)(?P<path>assets/[^"'\s()<>]+)''')
+
+# Pages published with the site; their own URLs are not hashed
+HTML_GLOBS = ['index.html', 'newsletter-*.html', 'sections/**/*.html']
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'public, max-age=0, must-revalidate'
+
+
+def file_digest(path):
+    """Return the sha256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hashed_name(rel_path, digest):
+    """assets/dir/logo.png -> assets/dir/logo.<hash>.png"""
+    path = Path(rel_path)
+    return path.with_name(f'{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}').as_posix()
+
+
+def load_manifest(out_dir):
+    manifest_path = out_dir / MANIFEST_NAME
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == MANIFEST_VERSION:
+            return manifest
+    return {'version': MANIFEST_VERSION, 'assets': {}, 'html': {}}
+
+
+def save_manifest(out_dir, manifest):
+    with open(out_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+
+def _unchanged(entry, stat):
+    return entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns
+
+
+def _remove_output(out_dir, rel_path):
+    for suffix in ('', '.gz', '.br'):
+        target = out_dir / (rel_path + suffix)
+        if target.exists():
+            target.unlink()
+
+
+def export_assets(base_dir, out_dir, manifest):
+    """Copy assets under hashed names. Returns (asset_map, copied_count)."""
+    previous = manifest['assets']
+    current = {}
+    copied = 0
+
+    for path in sorted((base_dir / 'assets').rglob('*')):
+        if not path.is_file() or path.name.startswith('.'):
+            continue
+        rel_path = path.relative_to(base_dir).as_posix()
+        stat = path.stat()
+        entry = previous.get(rel_path)
+        if not _unchanged(entry, stat):
+            entry = {
+                'size': stat.st_size,
+                'mtime': stat.st_mtime_ns,
+                'output': hashed_name(rel_path, file_digest(path)),
+            }
+        target = out_dir / entry['output']
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, target)
+            copied += 1
+        current[rel_path] = entry
+
+    # Drop hashed files that no longer correspond to a source asset
+    live_outputs = {e['output'] for e in current.values()}
+    for rel_path, entry in previous.items():
+        if entry['output'] not in live_outputs:
+            _remove_output(out_dir, entry['output'])
+
+    manifest['assets'] = current
+    return {rel_path: entry['output'] for rel_path, entry in current.items()}, copied
+
+
+def rewrite_asset_refs(content, asset_map):
+    """Replace every known assets/ reference in content with its hashed name."""
+    def replace(match):
+        hashed = asset_map.get(match.group('path'))
+        if hashed is None:
+            return match.group(0)
+        return match.group('prefix') + hashed
+    return ASSET_REF_PATTERN.sub(replace, content)
+
+
+def write_compressed(target, data):
+    """Write .gz (and .br when available) siblings of target."""
+    with open(str(target) + '.gz', 'wb') as f:
+        # mtime=0 keeps the output byte-stable so unchanged pages don't re-upload
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(str(target) + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def export_html(base_dir, out_dir, manifest, asset_map):
+    """Rewrite and precompress HTML files. Returns the number of files written."""
+    previous = manifest['html']
+    current = {}
+    written = 0
+
+    html_files = set()
+    for pattern in HTML_GLOBS:
+        html_files.update(base_dir.glob(pattern))
+
+    for path in sorted(html_files):
+        rel_path = path.relative_to(base_dir).as_posix()
+        with open(path, 'r', encoding='utf-8') as f:
+            content = rewrite_asset_refs(f.read(), asset_map)
+        data = content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        target = out_dir / rel_path
+
+        entry = previous.get(rel_path)
+        up_to_date = (
+            entry and entry['sha256'] == digest and target.exists()
+            and Path(str(target) + '.gz').exists()
+            and (brotli is None or Path(str(target) + '.br').exists())
+        )
+        if not up_to_date:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(data)
+            write_compressed(target, data)
+            written += 1
+        current[rel_path] = {'sha256': digest}
+
+    for rel_path in previous:
+        if rel_path not in current:
+            _remove_output(out_dir, rel_path)
+
+    manifest['html'] = current
+    return written
+
+
+def build_vercel_config(base_dir):
+    """Return the repo's vercel.json extended with cache headers for the export."""
+    config_path = base_dir / 'vercel.json'
+    if config_path.exists():
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    else:
+        config = {}
+
+    headers = config.setdefault('headers', [])
+    headers.append({
+        'source': f'/assets/(.*)\\.([0-9a-f]{{{HASH_LENGTH}}})\\.(.*)',
+        'headers': [{'key': 'Cache-Control', 'value': IMMUTABLE_CACHE}],
+    })
+    headers.append({
+        'source': '/(.*\\.html)',
+        'headers': [{'key': 'Cache-Control', 'value': REVALIDATE_CACHE}],
+    })
+    return config
+
+
+def main():
+    """Export the site into the deploy directory."""
+    base_dir = Path(__file__).parent.parent.parent
+    out_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else base_dir / 'dist'
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    if brotli is None:
+        print("Note: brotli module not installed, writing .gz files only")
+
+    manifest = load_manifest(out_dir)
+    asset_map, copied = export_assets(base_dir, out_dir, manifest)
+    written = export_html(base_dir, out_dir, manifest, asset_map)
+
+    with open(out_dir / 'vercel.json', 'w', encoding='utf-8') as f:
+        json.dump(build_vercel_config(base_dir), f, indent=2)
+        f.write('\n')
+    save_manifest(out_dir, manifest)
+
+    print(f"✓ Exported to {out_dir}")
+    print(f"  {copied} of {len(asset_map)} assets copied, "
+          f"{written} of {len(manifest['html'])} HTML files written")
+
+
+if __name__ == '__main__':
+    main()
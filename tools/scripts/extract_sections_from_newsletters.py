@@ -8,6 +8,11 @@ import re
 from pathlib import Path
 from html.parser import HTMLParser
 
+try:
+    from .email_lint import clamp_widths
+except ImportError:
+    from email_lint import clamp_widths
+
 def extract_bgcolor(html_content):
     """Extract background color from bgcolor attribute or style."""
     # Try bgcolor attribute first
@@ -87,7 +92,7 @@ def create_standalone_section(content, bgcolor, section_name, category):
     section_content = re.sub(r'src=["\']([^"\']*assets/)', r'src="/\1', section_content)
     
     # Constrain width attributes
-    section_content = re.sub(r'width="(\d+)"', lambda m: f'width="{min(int(m.group(1)), 600)}"' if int(m.group(1)) > 600 else m.group(0), section_content)
+    section_content = clamp_widths(section_content)
     
     # Create standalone HTML
     html = f'''<!DOCTYPE html>
@@ -8,35 +8,58 @@ import re
 from pathlib import Path
 import sys
 
-# Get file from command line or prompt
-if len(sys.argv) > 1:
-    backup_file = sys.argv[1]
-else:
-    backup_file = input("Enter backup file name (e.g., newsletter-8-backup.html): ").strip()
-
-if not Path(backup_file).exists():
-    print(f"Error: {backup_file} not found!")
-    sys.exit(1)
-
-urls = set()
-
-with open(backup_file, 'r', encoding='utf-8') as f:
-    content = f.read()
-    # Extract any HTTP/HTTPS image URLs (not just stripocdn.email)
-    # Pattern matches: http:// or https:// followed by domain and path ending with image extensions
-    matches = re.findall(r'https?://[^\s\"\'\>\)]+\.(?:png|jpg|jpeg|gif|webp|svg)', content, re.IGNORECASE)
-    for match in matches:
+URL_FILE = 'image_urls_clean.txt'
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg')
+
+# Any HTTP/HTTPS URL (not just stripocdn.email) ending with an image extension
+IMAGE_URL_PATTERN = re.compile(r'https?://[^\s\"\'\>\)]+\.(?:png|jpg|jpeg|gif|webp|svg)', re.IGNORECASE)
+
+
+def extract_image_urls(content):
+    """Return the set of image URLs found in an HTML document."""
+    urls = set()
+    for match in IMAGE_URL_PATTERN.findall(content):
         # Remove trailing characters that might be part of HTML attributes
         url = match.split(')')[0].split('"')[0].split("'")[0].split('>')[0].split(' ')[0]
-        if url.startswith(('http://', 'https://')) and url.endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp', '.svg')):
+        if url.startswith(('http://', 'https://')) and url.endswith(IMAGE_EXTENSIONS):
             urls.add(url)
+    return urls
+
+
+def write_url_list(urls, output_file=URL_FILE):
+    """Write URLs one per line, sorted."""
+    with open(output_file, 'w') as f:
+        for url in sorted(urls):
+            f.write(url + '\n')
+
+
+def read_url_list(url_file=URL_FILE):
+    """Read a URL list written by write_url_list()."""
+    with open(url_file, 'r') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Get file from command line or prompt
+    if argv:
+        backup_file = argv[0]
+    else:
+        backup_file = input("Enter backup file name (e.g., newsletter-8-backup.html): ").strip()
+
+    if not Path(backup_file).exists():
+        print(f"Error: {backup_file} not found!")
+        sys.exit(1)
+
+    with open(backup_file, 'r', encoding='utf-8') as f:
+        urls = extract_image_urls(f.read())
+
+    write_url_list(urls, URL_FILE)
 
-# Write cleaned URLs
-output_file = 'image_urls_clean.txt'
-with open(output_file, 'w') as f:
-    for url in sorted(urls):
-        f.write(url + '\n')
+    print(f'✓ Found {len(urls)} unique image URLs')
+    print(f'  Saved to {URL_FILE}')
 
-print(f'✓ Found {len(urls)} unique image URLs')
-print(f'  Saved to {output_file}')
 
+if __name__ == '__main__':
+    main()
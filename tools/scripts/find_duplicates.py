@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Find exact duplicates and shared blocks across newsletters and sections.
+
+Newsletters are split into their top-level row/table blocks; sections are
+stripped of the wrap_sections.py wrapper and split into the rows it holds.
+Each block is reduced to a normalized token stream (tag structure plus text
+words), shingled, and summarized with a MinHash signature stored under
+`path#block`. Signatures are bucketed with LSH banding so matching blocks
+are found without comparing every pair, and matches are reported per file
+pair, e.g. "sections/x.html ~ newsletter-5.html rows 4-6". The index is
+saved to tools/fingerprint_index.json and only files whose size or mtime
+changed are re-fingerprinted on the next run.
+
+Usage:
+    python3 tools/scripts/find_duplicates.py
+    python3 tools/scripts/find_duplicates.py --threshold 0.7 --json
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+import zlib
+from html.parser import HTMLParser
+from pathlib import Path
+
+try:
+    from .templates import SourceMap, collect_templates, section_content
+except ImportError:
+    from templates import SourceMap, collect_templates, section_content
+
+INDEX_VERSION = 2
+NUM_PERM = 128
+BANDS = 32
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.5
+
+# Blocks shorter than this (spacer rows, dividers) match everything, so
+# they keep their position in the numbering but aren't indexed
+MIN_BLOCK_TOKENS = 20
+
+# Mersenne prime used for the universal hash family
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Attributes whose values matter for layout; other attributes only
+# contribute their name so copy-edited styles don't hide a duplicate.
+LAYOUT_ATTRS = {'align', 'valign', 'width', 'colspan', 'rowspan', 'role', 'class'}
+
+BLOCK_TAGS = ('table', 'tr')
+
+
+class StructureTokenizer(HTMLParser):
+    """Turn an HTML document into a flat list of normalized tokens."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tokens = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('script', 'style'):
+            self._skip += 1
+            return
+        parts = [tag]
+        for name, value in sorted(attrs):
+            if name in LAYOUT_ATTRS and value:
+                parts.append(f'{name}={re.sub(r"[0-9]+", "0", value.lower())}')
+            else:
+                parts.append(name)
+        self.tokens.append('<' + ' '.join(parts))
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style'):
+            self._skip = max(0, self._skip - 1)
+            return
+        self.tokens.append('/' + tag)
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        for word in re.findall(r'\w+', data.lower()):
+            self.tokens.append(re.sub(r'[0-9]+', '0', word))
+
+
+def tokenize(html_content):
+    """Return the normalized structure/text tokens of an HTML document."""
+    parser = StructureTokenizer()
+    parser.feed(html_content)
+    parser.close()
+    return parser.tokens
+
+
+def shingle_hashes(tokens, size=SHINGLE_SIZE):
+    """Hash every run of `size` consecutive tokens to a 32-bit integer."""
+    if len(tokens) < size:
+        size = max(1, len(tokens))
+    hashes = set()
+    for i in range(len(tokens) - size + 1):
+        hashes.add(zlib.crc32('\x1f'.join(tokens[i:i + size]).encode('utf-8')))
+    return hashes
+
+
+def _permutations(num_perm, seed=1):
+    rng = random.Random(seed)
+    return [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+
+_PERMS = _permutations(NUM_PERM)
+
+
+def minhash(hashes, perms=_PERMS):
+    """Compute a MinHash signature for a set of shingle hashes."""
+    if not hashes:
+        return [_MAX_HASH] * len(perms)
+    return [min(((a * h + b) % _PRIME) & _MAX_HASH for h in hashes) for a, b in perms]
+
+
+def estimate_similarity(sig_a, sig_b):
+    """Estimate Jaccard similarity from two MinHash signatures."""
+    same = sum(1 for x, y in zip(sig_a, sig_b) if x == y)
+    return same / len(sig_a)
+
+
+class BlockSplitter(HTMLParser):
+    """Build a tree of table/tr elements with their source offsets."""
+
+    def __init__(self, source):
+        super().__init__(convert_charrefs=True)
+        self.roots = []
+        self._stack = []
+        self._length = len(source)
+        self._source_map = SourceMap(source)
+
+    def _offset(self):
+        return self._source_map.offset(self.getpos())
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in BLOCK_TAGS:
+            return
+        node = {'start': self._offset(), 'end': None, 'tag': tag, 'children': []}
+        (self._stack[-1]['children'] if self._stack else self.roots).append(node)
+        self._stack.append(node)
+
+    def handle_endtag(self, tag):
+        if tag not in BLOCK_TAGS or not any(n['tag'] == tag for n in self._stack):
+            return
+        # Close anything left open inside the element being ended
+        end = self._offset() + len(f'</{tag}>')
+        while self._stack:
+            node = self._stack.pop()
+            node['end'] = end
+            if node['tag'] == tag:
+                break
+
+    def close(self):
+        super().close()
+        for node in self._stack:
+            node['end'] = self._length
+        self._stack = []
+
+
+def split_blocks(content, descend=True):
+    """
+    Split HTML into its top-level row/table blocks.
+
+    With `descend`, single-child wrappers (the outer layout table, its only
+    row, ...) are skipped until the level where the document fans out into
+    several rows, which is how newsletters are laid out. Without it the
+    outermost rows are used as they are, which fits section content.
+    """
+    splitter = BlockSplitter(content)
+    splitter.feed(content)
+    splitter.close()
+    nodes = splitter.roots
+    if descend:
+        while len(nodes) == 1 and nodes[0]['children']:
+            nodes = nodes[0]['children']
+    if not nodes:
+        return [content]
+    return [content[n['start']:n['end']] for n in nodes]
+
+
+def fingerprint_blocks(content, is_section=False):
+    """Return one MinHash signature per block, None for blocks too short to index."""
+    if is_section:
+        blocks = split_blocks(section_content(content), descend=False)
+    else:
+        blocks = split_blocks(content)
+    signatures = []
+    for block in blocks:
+        tokens = tokenize(block)
+        signatures.append(minhash(shingle_hashes(tokens)) if len(tokens) >= MIN_BLOCK_TOKENS else None)
+    return signatures
+
+
+def format_blocks(numbers):
+    """[4, 5, 6, 9] -> '4-6, 9'"""
+    ranges = []
+    for n in sorted(numbers):
+        if ranges and n == ranges[-1][1] + 1:
+            ranges[-1][1] = n
+        else:
+            ranges.append([n, n])
+    return ', '.join(str(a) if a == b else f'{a}-{b}' for a, b in ranges)
+
+
+class FingerprintIndex:
+    """Block-level MinHash/LSH index over template files, persisted as JSON."""
+
+    def __init__(self, base_dir, bands=BANDS):
+        if NUM_PERM % bands:
+            raise ValueError(f"bands must divide {NUM_PERM}")
+        self.base_dir = Path(base_dir)
+        self.bands = bands
+        self.rows = NUM_PERM // bands
+        self.entries = {}
+        self.buckets = {}
+
+    @classmethod
+    def load(cls, base_dir, index_path, bands=BANDS):
+        """Load a saved index, or return an empty one if it is missing or stale."""
+        index = cls(base_dir, bands)
+        index_path = Path(index_path)
+        if index_path.exists():
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if (data.get('version') == INDEX_VERSION
+                    and data.get('num_perm') == NUM_PERM
+                    and data.get('shingle_size') == SHINGLE_SIZE):
+                for rel_path, entry in data.get('files', {}).items():
+                    index._add(rel_path, entry)
+        return index
+
+    def save(self, index_path):
+        data = {
+            'version': INDEX_VERSION,
+            'num_perm': NUM_PERM,
+            'shingle_size': SHINGLE_SIZE,
+            'files': self.entries,
+        }
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield (band, tuple(signature[start:start + self.rows]))
+
+    @staticmethod
+    def _block_keys(rel_path, entry):
+        for number, signature in enumerate(entry['blocks'], 1):
+            if signature is not None:
+                yield f'{rel_path}#{number}', signature
+
+    def signature(self, block_key):
+        rel_path, number = block_key.rsplit('#', 1)
+        return self.entries[rel_path]['blocks'][int(number) - 1]
+
+    def _add(self, rel_path, entry):
+        self.entries[rel_path] = entry
+        for block_key, signature in self._block_keys(rel_path, entry):
+            for key in self._band_keys(signature):
+                self.buckets.setdefault(key, set()).add(block_key)
+
+    def _remove(self, rel_path):
+        entry = self.entries.pop(rel_path, None)
+        if entry is None:
+            return
+        for block_key, signature in self._block_keys(rel_path, entry):
+            for key in self._band_keys(signature):
+                bucket = self.buckets.get(key)
+                if bucket:
+                    bucket.discard(block_key)
+                    if not bucket:
+                        del self.buckets[key]
+
+    def update(self, files):
+        """
+        Bring the index in line with `files`. Returns (added, updated, removed)
+        counts; unchanged files (same size and mtime) are not re-read. Files
+        under sections/ are fingerprinted without their page wrapper.
+        """
+        added = updated = 0
+        seen = set()
+        for path in files:
+            path = Path(path)
+            rel_path = path.relative_to(self.base_dir).as_posix()
+            seen.add(rel_path)
+            stat = path.stat()
+            old = self.entries.get(rel_path)
+            if old and old['size'] == stat.st_size and old['mtime'] == stat.st_mtime_ns:
+                continue
+            raw = path.read_bytes()
+            is_section = rel_path.startswith('sections/')
+            entry = {
+                'size': stat.st_size,
+                'mtime': stat.st_mtime_ns,
+                'sha256': hashlib.sha256(raw).hexdigest(),
+                'blocks': fingerprint_blocks(raw.decode('utf-8', 'replace'), is_section),
+            }
+            if old:
+                self._remove(rel_path)
+                updated += 1
+            else:
+                added += 1
+            self._add(rel_path, entry)
+
+        removed = [p for p in self.entries if p not in seen]
+        for rel_path in removed:
+            self._remove(rel_path)
+        return added, updated, len(removed)
+
+    def query(self, html_content, threshold=DEFAULT_THRESHOLD, is_section=False):
+        """
+        Return [(block_number, block_key, similarity)] of indexed blocks
+        similar to each block of html_content.
+        """
+        results = []
+        for number, signature in enumerate(fingerprint_blocks(html_content, is_section), 1):
+            if signature is None:
+                continue
+            candidates = set()
+            for key in self._band_keys(signature):
+                candidates.update(self.buckets.get(key, ()))
+            for block_key in candidates:
+                score = estimate_similarity(signature, self.signature(block_key))
+                if score >= threshold:
+                    results.append((number, block_key, score))
+        return sorted(results, key=lambda r: (r[0], -r[2], r[1]))
+
+    def exact_duplicates(self):
+        """Return groups of files with byte-identical content."""
+        by_hash = {}
+        for rel_path, entry in self.entries.items():
+            by_hash.setdefault(entry['sha256'], []).append(rel_path)
+        return sorted(sorted(group) for group in by_hash.values() if len(group) > 1)
+
+    def block_matches(self, threshold=DEFAULT_THRESHOLD):
+        """
+        Return block matches grouped by file pair, best first:
+        [(path_a, path_b, [(block_a, block_b, similarity), ...])].
+
+        Only block pairs sharing an LSH bucket are compared. Blocks within
+        one file and byte-identical files (see exact_duplicates()) are
+        skipped. In each pair the file with fewer blocks comes first, so a
+        section reads as "section ~ newsletter rows 4-6".
+        """
+        candidates = set()
+        for bucket in self.buckets.values():
+            if len(bucket) < 2:
+                continue
+            members = sorted(bucket)
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    candidates.add((a, b))
+
+        by_pair = {}
+        for key_a, key_b in candidates:
+            path_a, number_a = key_a.rsplit('#', 1)
+            path_b, number_b = key_b.rsplit('#', 1)
+            if path_a == path_b or self.entries[path_a]['sha256'] == self.entries[path_b]['sha256']:
+                continue
+            score = estimate_similarity(self.signature(key_a), self.signature(key_b))
+            if score < threshold:
+                continue
+            if (len(self.entries[path_a]['blocks']), path_a) > (len(self.entries[path_b]['blocks']), path_b):
+                path_a, number_a, path_b, number_b = path_b, number_b, path_a, number_a
+            by_pair.setdefault((path_a, path_b), []).append((int(number_a), int(number_b), score))
+
+        results = [(a, b, sorted(matches)) for (a, b), matches in by_pair.items()]
+        return sorted(results, key=lambda r: (-max(m[2] for m in r[2]), r[0], r[1]))
+
+    def describe(self, rel_path, numbers):
+        """'newsletter-5.html rows 4-6', or just the path for single-block files."""
+        if len(self.entries[rel_path]['blocks']) == 1:
+            return rel_path
+        numbers = set(numbers)
+        return f"{rel_path} {'row' if len(numbers) == 1 else 'rows'} {format_blocks(numbers)}"
+
+
+def main():
+    """Update the fingerprint index and print the duplicate report."""
+    base_dir = Path(__file__).parent.parent.parent
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'minimum estimated similarity for matching blocks (default {DEFAULT_THRESHOLD})')
+    parser.add_argument('--index', default=str(base_dir / 'tools' / 'fingerprint_index.json'),
+                        help='path of the persisted index')
+    parser.add_argument('--rebuild', action='store_true', help='ignore the saved index')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    if args.rebuild:
+        index = FingerprintIndex(base_dir)
+    else:
+        index = FingerprintIndex.load(base_dir, args.index)
+    added, updated, removed = index.update(collect_templates(base_dir))
+    index.save(args.index)
+
+    exact = index.exact_duplicates()
+    matches = index.block_matches(args.threshold)
+
+    if args.json:
+        json.dump({
+            'exact': exact,
+            'blocks': [{
+                'a': a,
+                'b': b,
+                'matches': [{'a': x, 'b': y, 'similarity': round(s, 3)} for x, y, s in pairs],
+            } for a, b, pairs in matches],
+        }, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"Indexed {len(index.entries)} templates "
+          f"({added} added, {updated} updated, {removed} removed)")
+
+    print(f"\nExact duplicates: {len(exact)} group(s)")
+    for group in exact:
+        print("  " + "  ==  ".join(group))
+
+    print(f"\nShared blocks (>= {args.threshold:.0%}): {len(matches)} file pair(s)")
+    for a, b, pairs in matches:
+        best = max(score for _, _, score in pairs)
+        print(f"  {best:5.0%}  {index.describe(a, [x for x, _, _ in pairs])}  ~  "
+              f"{index.describe(b, [y for _, y, _ in pairs])}")
+
+
+if __name__ == '__main__':
+    main()
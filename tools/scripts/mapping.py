@@ -0,0 +1,43 @@
+"""
+Read and write url_mapping.txt, the `remote_url|local_path` list that
+download_images.py produces and the other scripts consume.
+"""
+import re
+
+MAPPING_FILE = 'url_mapping.txt'
+
+
+def parse_url_mapping(text):
+    """Parse mapping file contents into a {remote_url: local_url} dict."""
+    url_mapping = {}
+    for line in text.splitlines():
+        if '|' in line:
+            orig_url, local_url = line.strip().split('|', 1)
+            url_mapping[orig_url] = local_url
+    return url_mapping
+
+
+def load_url_mapping(mapping_file=MAPPING_FILE):
+    """Load a mapping file. Raises FileNotFoundError if it doesn't exist."""
+    with open(mapping_file, 'r') as f:
+        return parse_url_mapping(f.read())
+
+
+def write_url_mapping(url_mapping, mapping_file=MAPPING_FILE):
+    """Write a mapping file, sorted by remote URL."""
+    with open(mapping_file, 'w') as f:
+        for orig_url, local_url in sorted(url_mapping.items()):
+            f.write(f"{orig_url}|{local_url}\n")
+
+
+def build_url_pattern(url_mapping):
+    """
+    Compile one regex matching any remote URL in the mapping, so a document
+    can be rewritten in a single pass. Longer URLs are tried first so a URL
+    that is a prefix of another doesn't shadow it. Returns None if empty.
+    """
+    if not url_mapping:
+        return None
+    urls = sorted(url_mapping, key=len, reverse=True)
+    return re.compile('|'.join(re.escape(url) for url in urls))
+
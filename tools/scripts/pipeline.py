@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Run extract -> download -> update -> restore for many newsletters in one process.
+
+The URL mapping is loaded once, shared by every newsletter, and written
+back once at the end with any newly downloaded images added. For each
+newsletter a backup named <backup-dir>/<name>-backup.html is used when it
+exists to find image URLs and restore src="#" placeholders.
+
+Usage:
+    python3 tools/scripts/pipeline.py newsletter-*.html
+    python3 tools/scripts/pipeline.py --mapping tools/url_mapping.txt --no-download newsletter-8.html
+    python3 tools/scripts/pipeline.py --self-test
+"""
+import argparse
+import importlib
+from pathlib import Path
+import sys
+import tempfile
+
+try:
+    from .download_images import download_images
+    from .extract_urls import extract_image_urls
+    from .mapping import MAPPING_FILE, build_url_pattern, load_url_mapping, write_url_mapping
+    from .restore_images import restore_images
+    from .update_image_paths import update_image_paths
+except ImportError:
+    from download_images import download_images
+    from extract_urls import extract_image_urls
+    from mapping import MAPPING_FILE, build_url_pattern, load_url_mapping, write_url_mapping
+    from restore_images import restore_images
+    from update_image_paths import update_image_paths
+
+
+class Pipeline:
+    """Holds the shared URL mapping (and its compiled pattern) across newsletters."""
+
+    def __init__(self, url_mapping=None, assets_dir='assets', download=True):
+        self.url_mapping = dict(url_mapping or {})
+        self.assets_dir = assets_dir
+        self.download = download
+        self.errors = []
+        self.mapping_changed = False
+        self._pattern = None
+
+    @property
+    def pattern(self):
+        if self._pattern is None:
+            self._pattern = build_url_pattern(self.url_mapping)
+        return self._pattern
+
+    def add_images(self, urls):
+        """Download any URLs not yet in the mapping. Returns how many were added."""
+        missing = sorted(set(urls) - self.url_mapping.keys())
+        if not missing or not self.download:
+            return 0
+        url_to_local, errors = download_images(missing, self.assets_dir, verbose=False)
+        self.errors.extend(errors)
+        if url_to_local:
+            self.url_mapping.update(url_to_local)
+            self.mapping_changed = True
+            self._pattern = None
+        return len(url_to_local)
+
+    def process(self, content, backup_content=None):
+        """
+        Run every stage on one document. Returns (content, stats) where stats
+        has 'downloaded', 'replacements', 'restored' and 'backgrounds' counts.
+        """
+        stats = {'downloaded': 0, 'replacements': 0, 'restored': 0, 'backgrounds': 0}
+        if backup_content is not None:
+            stats['downloaded'] = self.add_images(extract_image_urls(backup_content))
+        stats['downloaded'] += self.add_images(extract_image_urls(content))
+
+        content, stats['replacements'] = update_image_paths(content, self.url_mapping, self.pattern)
+
+        if backup_content is not None and 'src="#"' in content:
+            content, restored, stats['backgrounds'] = restore_images(
+                backup_content, content, self.url_mapping)
+            stats['restored'] = len(restored)
+        return content, stats
+
+    def process_file(self, newsletter_file, backup_file=None):
+        """Process a newsletter in place. Returns stats, plus 'changed'."""
+        newsletter_file = Path(newsletter_file)
+        with open(newsletter_file, 'r', encoding='utf-8') as f:
+            original = f.read()
+        backup_content = None
+        if backup_file is not None and Path(backup_file).exists():
+            with open(backup_file, 'r', encoding='utf-8') as f:
+                backup_content = f.read()
+
+        content, stats = self.process(original, backup_content)
+        stats['changed'] = content != original
+        if stats['changed']:
+            with open(newsletter_file, 'w', encoding='utf-8') as f:
+                f.write(content)
+        return stats
+
+
+def self_test():
+    """
+    Run the "Using the Scripts from Python" example from README.md through
+    the tools.scripts package, offline, and verify the results.
+    """
+    base_dir = Path(__file__).parent.parent.parent
+    if str(base_dir) not in sys.path:
+        sys.path.insert(0, str(base_dir))
+    package = importlib.import_module('tools.scripts')
+    # Touch Pipeline first: loading pipeline.py imports the submodules that
+    # share their names with exported functions
+    Pipeline = package.Pipeline
+    load_url_mapping = package.load_url_mapping
+    update_image_paths = package.update_image_paths
+
+    remote = 'https://cdn.example.com/img/hero.png'
+    html = f'<img src="{remote}" alt=""><img src="#" alt="">'
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / 'url_mapping.txt').write_text(f'{remote}|assets/hero.png\n', encoding='utf-8')
+        (tmp / 'newsletter-1-backup.html').write_text(f'<img src="{remote}"><img src="{remote}">',
+                                                       encoding='utf-8')
+        newsletter = tmp / 'newsletter-1.html'
+        newsletter.write_text(html, encoding='utf-8')
+
+        url_mapping = load_url_mapping(tmp / 'url_mapping.txt')
+        content, replacements = update_image_paths(html, url_mapping)
+        if replacements != 1 or remote in content:
+            failures.append(f'update_image_paths: {replacements} replacements, {content!r}')
+
+        pipeline = Pipeline(url_mapping, download=False)
+        stats = pipeline.process_file(newsletter, backup_file=tmp / f'{newsletter.stem}-backup.html')
+        result = newsletter.read_text(encoding='utf-8')
+        if not stats['changed'] or result.count('assets/hero.png') != 2:
+            failures.append(f'Pipeline.process_file: {stats}, {result!r}')
+
+    for failure in failures:
+        print(f"  ✗ {failure}")
+    if failures:
+        print("Self-test failed")
+        return False
+    print("✓ Self-test passed (README example)")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('newsletters', nargs='*', help='newsletter HTML files to process')
+    parser.add_argument('--mapping', default=MAPPING_FILE, help=f'URL mapping file (default {MAPPING_FILE})')
+    parser.add_argument('--backup-dir', default='tools', help='directory holding <name>-backup.html files')
+    parser.add_argument('--assets-dir', default='assets', help='where downloaded images are saved')
+    parser.add_argument('--no-download', action='store_true', help='only use images already in the mapping')
+    parser.add_argument('--self-test', action='store_true',
+                        help='run the README package example offline and exit')
+    args = parser.parse_args()
+
+    if args.self_test:
+        sys.exit(0 if self_test() else 1)
+    if not args.newsletters:
+        parser.error('at least one newsletter is required')
+
+    missing = [p for p in args.newsletters if not Path(p).exists()]
+    if missing:
+        print(f"Error: {missing[0]} not found!")
+        sys.exit(1)
+
+    url_mapping = load_url_mapping(args.mapping) if Path(args.mapping).exists() else {}
+    pipeline = Pipeline(url_mapping, args.assets_dir, download=not args.no_download)
+
+    for newsletter_file in args.newsletters:
+        backup_file = Path(args.backup_dir) / f'{Path(newsletter_file).stem}-backup.html'
+        stats = pipeline.process_file(newsletter_file, backup_file)
+        status = '✓ Updated' if stats['changed'] else '  Unchanged'
+        print(f"{status}: {newsletter_file} ({stats['downloaded']} downloaded, "
+              f"{stats['replacements']} URLs replaced, {stats['restored']} images and "
+              f"{stats['backgrounds']} backgrounds restored)")
+
+    if pipeline.mapping_changed:
+        write_url_mapping(pipeline.url_mapping, args.mapping)
+        print(f"\nMapping saved to {args.mapping} ({len(pipeline.url_mapping)} entries)")
+
+    if pipeline.errors:
+        print(f"\n{len(pipeline.errors)} errors occurred:")
+        for error in pipeline.errors:
+            print(f"  - {error}")
+
+
+if __name__ == '__main__':
+    main()
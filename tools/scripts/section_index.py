@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Build and query a searchable index of the section library.
+
+Every file under sections/<category>/ is recorded with its category,
+dominant background color, image count, byte size and text tokens (visible
+text, alt text, image and file names). Only the rows inside the
+wrap_sections.py wrapper are read; the wrapper table's own background
+(read with extract_bgcolor()) is the base color of whatever the rows don't
+cover with a background of their own. Tokens and
+categories go into an inverted index saved to tools/section_index.json;
+only sections whose size or mtime changed are re-read on the next run.
+
+Usage:
+    python3 tools/scripts/section_index.py footer social --dark
+    python3 tools/scripts/section_index.py --category heroes --color '#ffffff' --within 40
+    python3 tools/scripts/section_index.py --json travel
+"""
+import argparse
+import bisect
+import json
+import re
+import sys
+from html.parser import HTMLParser
+from pathlib import Path
+
+try:
+    from .extract_sections_from_newsletters import extract_bgcolor
+    from .templates import SourceMap, collect_sections, section_content, section_wrapper
+except ImportError:
+    from extract_sections_from_newsletters import extract_bgcolor
+    from templates import SourceMap, collect_sections, section_content, section_wrapper
+
+INDEX_VERSION = 3
+DEFAULT_WITHIN = 60
+
+# Image/link names that mark a section as containing social icons
+SOCIAL_NETWORKS = {'facebook', 'instagram', 'twitter', 'youtube', 'pinterest', 'linkedin', 'tiktok'}
+
+NAMED_COLORS = {'white': '#ffffff', 'black': '#000000'}
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+# Single characters and bare numbers are noise in a keyword index
+MIN_TOKEN_LENGTH = 2
+
+# Elements without an end tag, which would otherwise never leave the stack
+VOID_TAGS = {'area', 'base', 'br', 'col', 'hr', 'img', 'input', 'link', 'meta', 'source', 'wbr'}
+
+BACKGROUND_PATTERN = re.compile(r'background(?:-color)?\s*:\s*([^;]+)', re.IGNORECASE)
+COLOR_VALUE_PATTERN = re.compile(r'#[0-9a-f]{3,6}\b|rgba?\([^)]*\)|\b(?:white|black)\b', re.IGNORECASE)
+
+
+def normalize_color(value):
+    """Return a #rrggbb string for hex, rgb() and a few named colors, else None."""
+    if not value:
+        return None
+    value = value.strip().lower()
+    value = NAMED_COLORS.get(value, value)
+    match = re.fullmatch(r'#([0-9a-f]{3}|[0-9a-f]{6})', value)
+    if match:
+        digits = match.group(1)
+        if len(digits) == 3:
+            digits = ''.join(c * 2 for c in digits)
+        return '#' + digits
+    match = re.fullmatch(r'rgba?\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*(?:,\s*[\d.]+\s*)?\)', value)
+    if match:
+        return '#' + ''.join(f'{min(int(c), 255):02x}' for c in match.groups())
+    return None
+
+
+def color_rgb(color):
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def color_distance(a, b):
+    """Euclidean distance between two #rrggbb colors (0 - ~441)."""
+    return sum((x - y) ** 2 for x, y in zip(color_rgb(a), color_rgb(b))) ** 0.5
+
+
+def lightness(color):
+    """Relative luminance of a #rrggbb color, 0 (black) to 1 (white)."""
+    r, g, b = color_rgb(color)
+    return (0.2126 * r + 0.7152 * g + 0.0722 * b) / 255
+
+
+def element_background(attrs):
+    """Return the raw background color set by bgcolor= or style=, else None."""
+    for match in BACKGROUND_PATTERN.finditer(attrs.get('style') or ''):
+        color = COLOR_VALUE_PATTERN.search(match.group(1))
+        if color and normalize_color(color.group()):
+            return color.group()
+    bgcolor = attrs.get('bgcolor')
+    if bgcolor and normalize_color(bgcolor):
+        return bgcolor
+    return None
+
+
+def tokenize(text):
+    return [t for t in TOKEN_PATTERN.findall(text.lower())
+            if len(t) >= MIN_TOKEN_LENGTH and not t.isdigit()]
+
+
+class SectionParser(HTMLParser):
+    """
+    Collect text tokens, image count and background areas from a section's
+    email content. Each background color is weighted by the characters of
+    content its element spans, less what nested backgrounds cover; content
+    no element covers counts toward `base_color`.
+    """
+
+    def __init__(self, content, base_color=None):
+        super().__init__(convert_charrefs=True)
+        self.tokens = set()
+        self.images = 0
+        self.backgrounds = {}
+        self._skip = 0
+        self._length = len(content)
+        # Root entry standing for the wrapper, closed at the end of the content
+        self._stack = [['', base_color if normalize_color(base_color) else None, 0, 0]]
+        self._source_map = SourceMap(content)
+
+    def _offset(self):
+        return self._source_map.offset(self.getpos())
+
+    def _close(self, end):
+        tag, color, start, covered = self._stack.pop()
+        span = end - start
+        if color:
+            weight, raw = self.backgrounds.get(normalize_color(color), (0, color))
+            self.backgrounds[normalize_color(color)] = (weight + span - covered, raw)
+        if self._stack:
+            self._stack[-1][3] += span if color else covered
+
+    def dominant_background(self):
+        """Return the raw color covering the most content, or None."""
+        if not self.backgrounds:
+            return None
+        return max(self.backgrounds.values(), key=lambda b: b[0])[1]
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag not in VOID_TAGS:
+            self._stack.append([tag, element_background(attrs), self._offset(), 0])
+        if tag in ('script', 'style', 'title'):
+            self._skip += 1
+            return
+        if tag == 'img':
+            self.images += 1
+            self.tokens.update(tokenize(attrs.get('alt') or ''))
+            self.tokens.update(tokenize(Path(attrs.get('src') or '').stem))
+        elif tag == 'a':
+            self.tokens.update(t for t in tokenize(attrs.get('href') or '') if t in SOCIAL_NETWORKS)
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style', 'title'):
+            self._skip = max(0, self._skip - 1)
+        if any(entry[0] == tag for entry in self._stack):
+            end = self._offset() + len(f'</{tag}>')
+            while self._stack[-1][0] != tag:
+                self._close(end)
+            self._close(end)
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.tokens.update(tokenize(data))
+
+    def close(self):
+        super().close()
+        while self._stack:
+            self._close(self._length)
+
+
+def describe_section(path, category):
+    """Return the index entry for one section file."""
+    content = path.read_bytes().decode('utf-8', 'replace')
+    body = section_content(content)
+    wrapper = section_wrapper(content)
+    parser = SectionParser(body, extract_bgcolor(wrapper) if wrapper else None)
+    parser.feed(body)
+    parser.close()
+
+    tokens = parser.tokens | set(tokenize(path.stem)) | {category}
+    if tokens & SOCIAL_NETWORKS:
+        tokens.add('social')
+
+    bgcolor = parser.dominant_background()
+    stat = path.stat()
+    return {
+        'category': category,
+        'bgcolor': normalize_color(bgcolor),
+        'bgcolor_raw': bgcolor,
+        'images': parser.images,
+        'tokens': sorted(tokens),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+    }
+
+
+class SectionIndex:
+    """Section metadata plus inverted indexes on tokens and categories."""
+
+    def __init__(self, sections_dir):
+        self.sections_dir = Path(sections_dir)
+        self.entries = {}
+        self.by_token = {}
+        self.by_category = {}
+        self._vocabulary = None
+
+    @classmethod
+    def load(cls, sections_dir, index_path):
+        """Load a saved index, or return an empty one if it is missing or stale."""
+        index = cls(sections_dir)
+        index_path = Path(index_path)
+        if index_path.exists():
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == INDEX_VERSION:
+                for rel_path, entry in data.get('sections', {}).items():
+                    index._add(rel_path, entry)
+        return index
+
+    def save(self, index_path):
+        # The inverted indexes are rebuilt from the entries on load
+        data = {'version': INDEX_VERSION, 'sections': self.entries}
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+
+    def _add(self, rel_path, entry):
+        self._vocabulary = None
+        self.entries[rel_path] = entry
+        for token in entry['tokens']:
+            self.by_token.setdefault(token, set()).add(rel_path)
+        self.by_category.setdefault(entry['category'], set()).add(rel_path)
+
+    def _remove(self, rel_path):
+        entry = self.entries.pop(rel_path, None)
+        if entry is None:
+            return
+        self._vocabulary = None
+        for token in entry['tokens']:
+            postings = self.by_token.get(token)
+            if postings:
+                postings.discard(rel_path)
+                if not postings:
+                    del self.by_token[token]
+        postings = self.by_category.get(entry['category'])
+        if postings:
+            postings.discard(rel_path)
+            if not postings:
+                del self.by_category[entry['category']]
+
+    def update(self, sections=None):
+        """
+        Re-index changed sections and drop deleted ones. `sections` defaults
+        to collect_sections(). Returns (added, updated, removed) counts.
+        """
+        if sections is None:
+            sections = collect_sections(self.sections_dir)
+        added = updated = 0
+        seen = set()
+        for path, category in sections:
+            rel_path = path.relative_to(self.sections_dir).as_posix()
+            seen.add(rel_path)
+            stat = path.stat()
+            old = self.entries.get(rel_path)
+            if (old and old['size'] == stat.st_size and old['mtime'] == stat.st_mtime_ns
+                    and old['category'] == category):
+                continue
+            entry = describe_section(path, category)
+            if old:
+                self._remove(rel_path)
+                updated += 1
+            else:
+                added += 1
+            self._add(rel_path, entry)
+
+        removed = [p for p in self.entries if p not in seen]
+        for rel_path in removed:
+            self._remove(rel_path)
+        return added, updated, len(removed)
+
+    def _prefix_matches(self, prefix):
+        """Sections containing any token that starts with prefix."""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.by_token)
+        matches = set()
+        i = bisect.bisect_left(self._vocabulary, prefix)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(prefix):
+            matches |= self.by_token[self._vocabulary[i]]
+            i += 1
+        return matches
+
+    def search(self, keywords=(), category=None, color=None, within=DEFAULT_WITHIN,
+               dark=None, min_images=None, max_images=None):
+        """
+        Return matching sections as [(rel_path, entry)], sorted by path.
+
+        Keywords must all match (prefix matches count, so "foot" finds
+        "footer"). `color` keeps sections whose background is within
+        `within` of it; `dark` True/False keeps dark or light backgrounds.
+        """
+        if category is not None:
+            candidates = set(self.by_category.get(category, ()))
+        else:
+            candidates = set(self.entries)
+
+        for keyword in keywords:
+            for token in tokenize(keyword) or [keyword.lower()]:
+                candidates &= self._prefix_matches(token)
+            if not candidates:
+                return []
+
+        target = normalize_color(color) if color else None
+        if color and target is None:
+            raise ValueError(f"unrecognized color: {color}")
+
+        results = []
+        for rel_path in sorted(candidates):
+            entry = self.entries[rel_path]
+            bgcolor = entry['bgcolor']
+            if target and (bgcolor is None or color_distance(bgcolor, target) > within):
+                continue
+            if dark is not None and (bgcolor is None or (lightness(bgcolor) < 0.5) != dark):
+                continue
+            if min_images is not None and entry['images'] < min_images:
+                continue
+            if max_images is not None and entry['images'] > max_images:
+                continue
+            results.append((rel_path, entry))
+        return results
+
+
+def main():
+    """Update the section index and print the sections matching the query."""
+    base_dir = Path(__file__).parent.parent.parent
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('keywords', nargs='*', help='words that must all appear in the section')
+    parser.add_argument('--category', help='section folder, e.g. footer or heroes')
+    parser.add_argument('--color', help='background color to match, e.g. #333333')
+    parser.add_argument('--within', type=float, default=DEFAULT_WITHIN,
+                        help=f'max RGB distance from --color (default {DEFAULT_WITHIN})')
+    shade = parser.add_mutually_exclusive_group()
+    shade.add_argument('--dark', dest='dark', action='store_const', const=True, help='dark backgrounds only')
+    shade.add_argument('--light', dest='dark', action='store_const', const=False, help='light backgrounds only')
+    parser.add_argument('--min-images', type=int, help='minimum number of images')
+    parser.add_argument('--max-images', type=int, help='maximum number of images')
+    parser.add_argument('--index', default=str(base_dir / 'tools' / 'section_index.json'),
+                        help='path of the persisted index')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    sections_dir = base_dir / 'sections'
+    if not sections_dir.exists():
+        print(f"Error: Sections directory not found at {sections_dir}")
+        sys.exit(1)
+
+    index = SectionIndex.load(sections_dir, args.index)
+    added, updated, removed = index.update()
+    if added or updated or removed:
+        index.save(args.index)
+
+    try:
+        results = index.search(args.keywords, args.category, args.color, args.within,
+                               args.dark, args.min_images, args.max_images)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    if args.json:
+        json.dump([dict(path=rel_path, **{k: v for k, v in entry.items() if k != 'mtime'})
+                   for rel_path, entry in results], sys.stdout, indent=2)
+        print()
+        return
+
+    for rel_path, entry in results:
+        print(f"{rel_path:55} {entry['bgcolor'] or entry['bgcolor_raw'] or '-':8} "
+              f"{entry['images']:3} img  {entry['size'] / 1024:6.1f} KB")
+    print(f"\n{len(results)} of {len(index.entries)} sections match")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Locate the newsletters and sections the tools operate on, and the helpers
+their HTML parsers share.
+"""
+import bisect
+import re
+from pathlib import Path
+
+# Gallery/preview pages in sections/ that are not sections themselves
+NON_SECTION_FILES = {'overview.html', 'preview.html', '_preview-wrapper.html'}
+
+# The page wrapper wrap_sections.py puts around a section: a container div
+# holding one 600px table whose rows are the section itself
+SECTION_WRAPPER_PATTERN = re.compile(
+    r'<div[^>]*class="email-container"[^>]*>\s*<table\b[^>]*>', re.IGNORECASE)
+
+
+class SourceMap:
+    """Convert between HTMLParser.getpos() (line, col) positions and source offsets."""
+
+    def __init__(self, source):
+        self.line_starts = [0]
+        for match in re.finditer('\n', source):
+            self.line_starts.append(match.end())
+
+    def offset(self, pos):
+        line, col = pos
+        return self.line_starts[line - 1] + col
+
+    def position(self, offset):
+        line = bisect.bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1]
+
+
+def collect_sections(sections_dir):
+    """Return (path, category) for every section file, category being its folder."""
+    sections_dir = Path(sections_dir)
+    sections = []
+    for path in sorted(sections_dir.rglob('*.html')):
+        rel_parts = path.relative_to(sections_dir).parts
+        if path.name in NON_SECTION_FILES or len(rel_parts) < 2:
+            continue
+        sections.append((path, rel_parts[0]))
+    return sections
+
+
+def collect_templates(base_dir):
+    """Return every newsletter and section HTML file under base_dir."""
+    base_dir = Path(base_dir)
+    files = sorted(base_dir.glob('newsletter-*.html'))
+    sections_dir = base_dir / 'sections'
+    if sections_dir.exists():
+        files.extend(path for path, _ in collect_sections(sections_dir))
+    return files
+
+
+def section_wrapper(content):
+    """Return the opening tag of a section's wrapper table, or None if unwrapped."""
+    match = SECTION_WRAPPER_PATTERN.search(content)
+    if not match:
+        return None
+    return match.group()[match.group().lower().rfind('<table'):]
+
+
+def section_content(content):
+    """
+    Return the rows inside a section's wrap_sections.py wrapper, without the
+    shared <head> and container markup. Unwrapped content is returned as is.
+    """
+    match = SECTION_WRAPPER_PATTERN.search(content)
+    if not match:
+        return content
+    end = content.rfind('</table>')
+    return content[match.end():end] if end >= match.end() else content[match.end():]
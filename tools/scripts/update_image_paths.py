@@ -2,71 +2,67 @@
 """
 Update HTML file to replace remote image URLs with local asset paths.
 """
-import re
 from pathlib import Path
 import sys
 
-# Load URL mapping
-mapping_file = 'url_mapping.txt'
-if not Path(mapping_file).exists():
-    print(f"Error: {mapping_file} not found!")
-    print("Please run download_images.py first to create the mapping.")
-    sys.exit(1)
+try:
+    from .mapping import MAPPING_FILE, build_url_pattern, load_url_mapping
+except ImportError:
+    from mapping import MAPPING_FILE, build_url_pattern, load_url_mapping
 
-url_mapping = {}
-with open(mapping_file, 'r') as f:
-    for line in f:
-        if '|' in line:
-            orig_url, local_url = line.strip().split('|', 1)
-            url_mapping[orig_url] = local_url
 
-if not url_mapping:
-    print("No URL mappings found!")
-    sys.exit(1)
+def update_image_paths(content, url_mapping, pattern=None):
+    """
+    Replace every remote URL from url_mapping in content with its local path
+    (src/background attributes, CSS url() and anywhere else it appears).
 
-# Get file to update from command line or use default
-if len(sys.argv) > 1:
-    newsletter_file = sys.argv[1]
-else:
-    newsletter_file = input("Enter newsletter file name (e.g., newsletter-8.html): ").strip()
+    `pattern` is build_url_pattern(url_mapping); pass it in when updating
+    many documents with the same mapping. Returns (content, replacements).
+    """
+    if pattern is None:
+        pattern = build_url_pattern(url_mapping)
+    if pattern is None:
+        return content, 0
+    return pattern.subn(lambda m: url_mapping[m.group(0)], content)
 
-if not Path(newsletter_file).exists():
-    print(f"Error: {newsletter_file} not found!")
-    sys.exit(1)
 
-# Read current file
-with open(newsletter_file, 'r', encoding='utf-8') as f:
-    content = f.read()
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
 
-original_content = content
-replacements = 0
+    # Load URL mapping
+    if not Path(MAPPING_FILE).exists():
+        print(f"Error: {MAPPING_FILE} not found!")
+        print("Please run download_images.py first to create the mapping.")
+        sys.exit(1)
 
-# Replace all URLs
-for orig_url, local_url in url_mapping.items():
-    # Replace in src attributes
-    content = content.replace(f'src="{orig_url}"', f'src="{local_url}"')
-    content = content.replace(f"src='{orig_url}'", f"src='{local_url}'")
-    
-    # Replace in background-image URLs
-    content = content.replace(f'url({orig_url})', f'url({local_url})')
-    content = content.replace(f"url('{orig_url}')", f"url('{local_url}')")
-    content = content.replace(f'url("{orig_url}")', f'url("{local_url}")')
-    
-    # Replace in background attributes
-    content = content.replace(f'background="{orig_url}"', f'background="{local_url}"')
-    content = content.replace(f"background='{orig_url}'", f"background='{local_url}'")
-    
-    if orig_url in content:
-        count = content.count(orig_url)
-        content = content.replace(orig_url, local_url)
-        replacements += count
+    url_mapping = load_url_mapping(MAPPING_FILE)
+    if not url_mapping:
+        print("No URL mappings found!")
+        sys.exit(1)
 
-# Write updated content
-if content != original_content:
-    with open(newsletter_file, 'w', encoding='utf-8') as f:
-        f.write(content)
-    print(f"✓ Updated: {newsletter_file}")
-    print(f"  {replacements} URL replacements made")
-else:
-    print("No changes needed - file already uses local paths or no matching URLs found")
+    # Get file to update from command line or use default
+    if argv:
+        newsletter_file = argv[0]
+    else:
+        newsletter_file = input("Enter newsletter file name (e.g., newsletter-8.html): ").strip()
 
+    if not Path(newsletter_file).exists():
+        print(f"Error: {newsletter_file} not found!")
+        sys.exit(1)
+
+    with open(newsletter_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    content, replacements = update_image_paths(content, url_mapping)
+
+    if replacements:
+        with open(newsletter_file, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"✓ Updated: {newsletter_file}")
+        print(f"  {replacements} URL replacements made")
+    else:
+        print("No changes needed - file already uses local paths or no matching URLs found")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,9 +4,13 @@ Script to wrap section HTML files in complete email template structure with max-
 """
 
 import os
-import re
 from pathlib import Path
 
+try:
+    from .email_lint import clamp_widths
+except ImportError:
+    from email_lint import clamp_widths
+
 def wrap_section_file(file_path):
     """Wrap a section file in complete HTML email template structure."""
     
@@ -20,8 +24,7 @@ def wrap_section_file(file_path):
         return False
     
     # Constrain width attributes that exceed 600px
-    content = re.sub(r'width="(\d+)"', lambda m: f'width="{min(int(m.group(1)), 600)}"' if int(m.group(1)) > 600 else m.group(0), content)
-    content = re.sub(r'width:(\d+)px', lambda m: f'width:{min(int(m.group(1)), 600)}px' if int(m.group(1)) > 600 else m.group(0), content)
+    content = clamp_widths(content)
     
     # Wrap in complete HTML structure
     wrapped_content = f'''<!DOCTYPE html>